@@ -3,13 +3,15 @@
 from __future__ import annotations
 
 import os
-from typing import AsyncGenerator
+import time
+from typing import AsyncGenerator, Optional
 
 from google.adk.agents import LlmAgent
 from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.models.base_llm import BaseLlm
 from google.adk.models.lite_llm import LiteLlm
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
+from google.adk.sessions import InMemorySessionService, Session
 from google.genai.types import Content, Part
 
 from config import (
@@ -17,57 +19,134 @@ from config import (
     DEFAULT_USER_ID,
     THESYS_API_KEY,
     THESYS_BASE_URL,
+    THESYS_FAST_MODEL,
     THESYS_MODEL,
 )
 
 from prompt import SYSTEM_PROMPT
 from custom_components import THESYS_CUSTOM_COMPONENT_METADATA
+from model_router import (
+    FAST_TIER,
+    FULL_TIER,
+    RouteDecision,
+    RoutingStats,
+    ThreadEvent,
+    TurnClassifier,
+)
 from tools import build_daily_itinerary, search_flights, search_hotels, summarize_trip_plan
+from traffic_capture import TrafficRecorder, recorder_from_config
 
 
 class TravelPlannerAgent:
     """ADK-backed travel planner with tool-calling support."""
 
-    def __init__(self) -> None:
-        # Step 1: Fail fast if credentials are missing.
-        if not THESYS_API_KEY:
-            raise ValueError("THESYS_API_KEY is required. Set it in backend/.env")
-
-        # Step 2: Expose Thesys credentials in OpenAI-compatible env vars
-        # because ADK's LiteLLM adapter reads these names internally.
-        os.environ["OPENAI_API_KEY"] = THESYS_API_KEY
-        os.environ["OPENAI_API_BASE"] = THESYS_BASE_URL
-
-        # Step 3: Create the model adapter and attach custom component metadata
-        # so the model can return payloads that map to frontend components.
-        model = LiteLlm(
-            model=THESYS_MODEL,
-            metadata=THESYS_CUSTOM_COMPONENT_METADATA,
-        )
-
-        # Step 4: Build the ADK agent with system instructions and tool set.
-        self.agent = LlmAgent(
-            name="travel_planner",
-            model=model,
-            instruction=SYSTEM_PROMPT,
-            tools=[
-                search_flights,
-                search_hotels,
-                build_daily_itinerary,
-                summarize_trip_plan,
-            ],
-        )
+    def __init__(
+        self,
+        model: Optional[BaseLlm] = None,
+        recorder: Optional[TrafficRecorder] = None,
+        fast_model: Optional[BaseLlm] = None,
+    ) -> None:
+        """
+        Args:
+            model:      Optional full-tier model override (e.g. the replay stub).
+                        Defaults to the Thesys model configured in ``config``.
+            recorder:   Optional traffic recorder; each turn is appended to its
+                        log when set.
+            fast_model: Optional fast-tier model override. When ``model`` is
+                        not overridden it defaults to ``THESYS_FAST_MODEL``;
+                        without a fast model every turn runs on ``model``.
+        """
+        if model is None:
+            # Step 1: Fail fast if credentials are missing.
+            if not THESYS_API_KEY:
+                raise ValueError("THESYS_API_KEY is required. Set it in backend/.env")
+
+            # Step 2: Expose Thesys credentials in OpenAI-compatible env vars
+            # because ADK's LiteLLM adapter reads these names internally.
+            os.environ["OPENAI_API_KEY"] = THESYS_API_KEY
+            os.environ["OPENAI_API_BASE"] = THESYS_BASE_URL
+
+            # Step 3: Create the model adapter and attach custom component metadata
+            # so the model can return payloads that map to frontend components.
+            model = LiteLlm(
+                model=THESYS_MODEL,
+                metadata=THESYS_CUSTOM_COMPONENT_METADATA,
+            )
+            if fast_model is None and THESYS_FAST_MODEL:
+                fast_model = LiteLlm(
+                    model=THESYS_FAST_MODEL,
+                    metadata=THESYS_CUSTOM_COMPONENT_METADATA,
+                )
+
+        self.recorder = recorder
+        self.classifier = TurnClassifier()
+        self.routing_stats = RoutingStats()
+
+        # Step 4: Build one ADK agent per model tier with the same system
+        # instructions and tool set. The agents share a name so each tier
+        # sees earlier turns as its own history rather than another agent's.
+        tier_models = {FULL_TIER: model}
+        if fast_model is not None:
+            tier_models[FAST_TIER] = fast_model
+        self.agents = {
+            tier: LlmAgent(
+                name="travel_planner",
+                model=tier_model,
+                instruction=SYSTEM_PROMPT,
+                tools=[
+                    search_flights,
+                    search_hotels,
+                    build_daily_itinerary,
+                    summarize_trip_plan,
+                ],
+            )
+            for tier, tier_model in tier_models.items()
+        }
+        self.agent = self.agents[FULL_TIER]
 
         # Step 5: Initialize an in-memory session store so each thread id
         # can maintain its own conversational context.
         self.session_service = InMemorySessionService()
 
-        # Step 6: Create the ADK runner that executes the agent for each request.
-        self.runner = Runner(
-            app_name=APP_NAME,
-            agent=self.agent,
-            session_service=self.session_service,
-        )
+        # Step 6: Create one ADK runner per tier. All runners share the app
+        # name and session store, so history stays intact across tiers.
+        self.runners = {
+            tier: Runner(
+                app_name=APP_NAME,
+                agent=tier_agent,
+                session_service=self.session_service,
+            )
+            for tier, tier_agent in self.agents.items()
+        }
+        self.runner = self.runners[FULL_TIER]
+
+    def route(self, user_message: str, session: Session) -> RouteDecision:
+        """Pick the model tier for a turn from the message and thread history."""
+        # Step 1: Summarize earlier events so the classifier can see whether
+        # the thread is new, which selections were made and whether the model
+        # last asked a clarification question. Tool results are skipped.
+        history = []
+        for event in session.events:
+            if event.get_function_responses():
+                continue
+            text = "".join(
+                part.text
+                for part in (event.content.parts if event.content and event.content.parts else [])
+                if part.text and not part.thought
+            )
+            history.append(
+                ThreadEvent(
+                    author="user" if event.author == "user" else "model",
+                    text=text,
+                    has_function_calls=bool(event.get_function_calls()),
+                )
+            )
+        decision = self.classifier.classify(user_message, history)
+
+        # Step 2: Fall back to the full tier when no fast model is configured.
+        if decision.tier not in self.runners:
+            return RouteDecision(FULL_TIER, f"{decision.reason}:no_fast_tier")
+        return decision
 
     async def process_message(
         self, thread_id: str, user_message: str
@@ -106,19 +185,49 @@ class TravelPlannerAgent:
             response_modalities=["TEXT"],
         )
 
-        # Step 5: Execute the agent run and stream each textual part as it arrives.
-        async for event in self.runner.run_async(
-            user_id=DEFAULT_USER_ID,
-            session_id=session.id,
-            new_message=content,
-            run_config=run_config,
-        ):
-            # Step 6: Guard against non-text events and yield only text chunks
-            # expected by the frontend SSE consumer.
-            if event.content and event.content.parts:
-                for part in event.content.parts:
-                    if part.text:
-                        yield part.text
-
-
-travel_planner_agent = TravelPlannerAgent()
\ No newline at end of file
+        # Step 5: Route the turn to a model tier before the runner starts.
+        decision = self.route(user_message, session)
+        started = time.perf_counter()
+        ttft_ms: Optional[float] = None
+
+        # Step 6: Start a traffic recording for this turn when capture is on.
+        recording = (
+            self.recorder.start_turn(thread_id, user_message) if self.recorder else None
+        )
+        if recording:
+            recording.set_route(decision)
+
+        # Step 7: Execute the agent run and stream each textual part as it arrives.
+        try:
+            async for event in self.runners[decision.tier].run_async(
+                user_id=DEFAULT_USER_ID,
+                session_id=session.id,
+                new_message=content,
+                run_config=run_config,
+            ):
+                if recording:
+                    recording.add_event(event)
+
+                # Step 8: Guard against non-text events and yield only text chunks
+                # expected by the frontend SSE consumer.
+                if event.content and event.content.parts:
+                    for part in event.content.parts:
+                        if part.text:
+                            if ttft_ms is None:
+                                ttft_ms = (time.perf_counter() - started) * 1000
+                            yield part.text
+        except Exception as e:
+            if recording:
+                recording.error = repr(e)
+            raise
+        finally:
+            # Step 9: Record per-tier latency and flush the turn, even when the
+            # client disconnects mid-stream.
+            self.routing_stats.record(
+                decision, ttft_ms, (time.perf_counter() - started) * 1000
+            )
+            if recording:
+                recording.finish()
+
+
+travel_planner_agent = TravelPlannerAgent(recorder=recorder_from_config())
\ No newline at end of file
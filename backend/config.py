@@ -17,3 +17,25 @@ APP_NAME = os.getenv("APP_NAME", "travel_planner")
 DEFAULT_USER_ID = os.getenv("DEFAULT_USER_ID", "demo_user")
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
 PORT = int(os.getenv("PORT", "8000"))
+
+# Optional production traffic capture for offline performance replay.
+TRAFFIC_CAPTURE_ENABLED = os.getenv("TRAFFIC_CAPTURE_ENABLED", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+TRAFFIC_CAPTURE_PATH = os.getenv("TRAFFIC_CAPTURE_PATH", "traffic/turns.jsonl")
+TRAFFIC_CAPTURE_MAX_BYTES = int(os.getenv("TRAFFIC_CAPTURE_MAX_BYTES", str(10 * 1024 * 1024)))
+TRAFFIC_CAPTURE_BACKUP_COUNT = int(os.getenv("TRAFFIC_CAPTURE_BACKUP_COUNT", "5"))
+TRAFFIC_CAPTURE_REDACT_KEYS = [
+    key.strip().lower()
+    for key in os.getenv(
+        "TRAFFIC_CAPTURE_REDACT_KEYS",
+        "api_key,authorization,password,secret,token,email,phone",
+    ).split(",")
+    if key.strip()
+]
+
+# Optional tiered model routing. When THESYS_FAST_MODEL is set, cheap turns
+# (acknowledgements, comparison re-renders) run on it instead of THESYS_MODEL.
+THESYS_FAST_MODEL = os.getenv("THESYS_FAST_MODEL", "")
@@ -4,6 +4,8 @@ Request/response shape matches exactly what the C1Chat component sends,
 mirroring the pattern from the reference AssistantAgent implementation.
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
@@ -37,15 +39,25 @@ class ChatRequest(BaseModel):
 # App                                                                          #
 # --------------------------------------------------------------------------- #
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Step 3: Flush queued traffic-capture records on shutdown or reload so
+    # the last turns before a restart are not lost.
+    yield
+    if travel_planner_agent.recorder:
+        travel_planner_agent.recorder.close()
+
+
 app = FastAPI(
-    # Step 3: Initialize the API application and basic metadata.
+    # Step 4: Initialize the API application and basic metadata.
     title="Travel Planner API",
     description="Multi-agent travel planner powered by Google ADK + Thesys C1",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
-    # Step 4: Allow frontend origins to call this backend during local dev.
+    # Step 5: Allow frontend origins to call this backend during local dev.
     CORSMiddleware,
     allow_origins=[FRONTEND_URL, "http://localhost:3000", "http://localhost:5173"],
     allow_credentials=True,
@@ -60,7 +72,7 @@ app.add_middleware(
 
 @app.get("/")
 async def root():
-    # Step 5: Provide a lightweight root endpoint for quick status checks.
+    # Step 6: Provide a lightweight root endpoint for quick status checks.
     return {
         "status": "ok",
         "message": "Travel Planner API is running",
@@ -70,10 +82,16 @@ async def root():
 
 @app.get("/health")
 async def health():
-    # Step 6: Expose a simple health endpoint for probes and uptime checks.
+    # Step 7: Expose a simple health endpoint for probes and uptime checks.
     return {"status": "healthy"}
 
 
+@app.get("/api/routing/stats")
+async def routing_stats():
+    # Step 8: Report per-tier routing decisions and latency for threshold tuning.
+    return travel_planner_agent.routing_stats.snapshot()
+
+
 @app.post("/api/chat")
 async def chat(request: ChatRequest):
     """
@@ -83,7 +101,7 @@ async def chat(request: ChatRequest):
     interactive UI: flight cards, hotel cards, itinerary timeline, budget chart.
     """
     try:
-        # Step 7: Delegate message processing to the ADK agent and stream SSE.
+        # Step 9: Delegate message processing to the ADK agent and stream SSE.
         return StreamingResponse(
             travel_planner_agent.process_message(
                 thread_id=request.threadId,
@@ -91,19 +109,19 @@ async def chat(request: ChatRequest):
             ),
             media_type="text/event-stream",
             headers={
-                # Step 8: Prevent buffering so streamed chunks reach the UI immediately.
+                # Step 10: Prevent buffering so streamed chunks reach the UI immediately.
                 "Cache-Control": "no-cache, no-transform",  # no-transform prevents proxy buffering
                 "Connection": "keep-alive",
             },
         )
     except Exception as e:
-        # Step 9: Convert runtime failures into a standard HTTP 500 response.
+        # Step 11: Convert runtime failures into a standard HTTP 500 response.
         print(f"Chat endpoint error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 if __name__ == "__main__":
-    # Step 10: Run the app locally with auto-reload for development.
+    # Step 12: Run the app locally with auto-reload for development.
     print(f"Starting Travel Planner server on port {PORT}")
     print(f"Frontend URL: {FRONTEND_URL}")
     print(f"API available at: http://localhost:{PORT}/api/chat")
@@ -0,0 +1,162 @@
+"""Turn classification and latency bookkeeping for tiered model routing."""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence
+
+from custom_components import CUSTOM_COMPONENT_SCHEMAS
+
+FAST_TIER = "fast"
+FULL_TIER = "full"
+
+TRIGGER_PREFIX = "COMPONENT_TRIGGER "
+
+# Trigger actions that only re-render options already on screen. Every other
+# trigger (selections, itinerary and budget actions) runs new tools or
+# builds the plan, so it stays on the full tier.
+FAST_TRIGGER_ACTIONS = frozenset({"compare_flights", "compare_hotels"})
+
+# Acknowledgement phrases; a message made up only of these is cheap to answer.
+_ACKNOWLEDGEMENT = (
+    r"(?:ok(?:ay)?|thanks?(?: you)?|thx|ty|great|perfect|cool|nice|awesome|"
+    r"got it|sounds (?:good|great)|looks (?:good|great)|love it|so much|a lot)"
+)
+ACKNOWLEDGEMENT_PATTERN = re.compile(
+    rf"^\W*{_ACKNOWLEDGEMENT}(?:[\s,.!]+{_ACKNOWLEDGEMENT})*\W*$",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class ThreadEvent:
+    """A compact view of one earlier session event used for routing."""
+
+    author: str  # "user" or "model"
+    text: str = ""
+    has_function_calls: bool = False
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    """The tier chosen for a turn and a short, stable reason for tuning."""
+
+    tier: str
+    reason: str
+
+
+def parse_trigger_action(message: str) -> Optional[str]:
+    """Return the ``action`` of a ``COMPONENT_TRIGGER`` message, if any."""
+    for line in message.splitlines():
+        if line.startswith(TRIGGER_PREFIX):
+            try:
+                payload = json.loads(line[len(TRIGGER_PREFIX):])
+            except json.JSONDecodeError:
+                return None
+            action = payload.get("action") if isinstance(payload, dict) else None
+            return action if isinstance(action, str) else None
+    return None
+
+
+def _is_clarification(model_events: Sequence[ThreadEvent]) -> bool:
+    # Step 1: The prompt asks a one-line question when constraints are
+    # missing; that reply calls no tools and renders no custom component.
+    text = "".join(event.text for event in model_events)
+    if not text.strip() or any(event.has_function_calls for event in model_events):
+        return False
+    return not any(name in text for name in CUSTOM_COMPONENT_SCHEMAS)
+
+
+class TurnClassifier:
+    """Rule-based classifier that picks a model tier for each user message.
+
+    The fast tier is an allow-list of turns that need no new planning work:
+    comparison triggers over options already on screen and pure
+    acknowledgements. Everything else, including short messages such as
+    "What about Porto?", goes to the full tier.
+    """
+
+    def classify(
+        self, user_message: str, history: Sequence[ThreadEvent] = ()
+    ) -> RouteDecision:
+        """
+        Args:
+            user_message: The current raw user message.
+            history:      Earlier events in the same thread, oldest first.
+        """
+        user_messages = [event.text for event in history if event.author == "user"]
+
+        # Step 1: UI triggers carry an explicit action, so route on it.
+        action = parse_trigger_action(user_message)
+        if action is not None:
+            tier = FAST_TIER if action in FAST_TRIGGER_ACTIONS else FULL_TIER
+            return RouteDecision(tier, f"trigger:{action}")
+
+        # Step 2: The first message of a thread is the initial recommendation
+        # step, however short it is.
+        if not user_messages:
+            return RouteDecision(FULL_TIER, "thread_start")
+
+        # Step 3: An answer to a clarification question fills in the missing
+        # constraints, so the model now searches and renders the plan.
+        last_user_index = max(
+            index for index, event in enumerate(history) if event.author == "user"
+        )
+        if _is_clarification(
+            [event for event in history[last_user_index + 1 :] if event.author == "model"]
+        ):
+            return RouteDecision(FULL_TIER, "clarification_answer")
+
+        # Step 4: A pure acknowledgement needs no tools or re-rendering.
+        if ACKNOWLEDGEMENT_PATTERN.match(user_message):
+            return RouteDecision(FAST_TIER, "acknowledgement")
+
+        return RouteDecision(FULL_TIER, "default")
+
+
+class RoutingStats:
+    """In-memory per-tier counters for routing decisions and latency."""
+
+    def __init__(self) -> None:
+        self._tiers: dict[str, dict[str, Any]] = {}
+
+    def record(
+        self,
+        decision: RouteDecision,
+        ttft_ms: Optional[float],
+        duration_ms: float,
+    ) -> None:
+        # Step 1: Lazily create the bucket for a tier on its first turn.
+        tier = self._tiers.setdefault(
+            decision.tier,
+            {
+                "turns": 0,
+                "ttft_turns": 0,
+                "ttft_ms_total": 0.0,
+                "duration_ms_total": 0.0,
+                "reasons": {},
+            },
+        )
+        # Step 2: Accumulate sums so means stay O(1) per turn.
+        tier["turns"] += 1
+        tier["duration_ms_total"] += duration_ms
+        if ttft_ms is not None:
+            tier["ttft_turns"] += 1
+            tier["ttft_ms_total"] += ttft_ms
+        tier["reasons"][decision.reason] = tier["reasons"].get(decision.reason, 0) + 1
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Return per-tier turn counts, reasons and mean latencies."""
+        return {
+            name: {
+                "turns": tier["turns"],
+                "mean_ttft_ms": round(tier["ttft_ms_total"] / tier["ttft_turns"], 2)
+                if tier["ttft_turns"]
+                else None,
+                "mean_duration_ms": round(tier["duration_ms_total"] / tier["turns"], 2),
+                "reasons": dict(tier["reasons"]),
+            }
+            for name, tier in self._tiers.items()
+        }
@@ -0,0 +1,269 @@
+"""
+Replay captured production turns against the FastAPI app with a stubbed model.
+
+The stub reproduces each recorded turn's chunk timing and tool-call sequence,
+while the real tools, session handling and SSE route run unchanged, so
+performance changes can be compared turn by turn against real traffic shapes.
+
+Usage:
+    python replay.py traffic/turns.jsonl [--speed 1.0] [--output results.jsonl]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from collections import deque
+from typing import Any, AsyncGenerator, Optional
+
+# Step 1: Replays never reach the real model and must not record themselves,
+# so neutralize credentials and capture before the app modules are imported.
+os.environ.setdefault("THESYS_API_KEY", "replay-offline")
+os.environ["TRAFFIC_CAPTURE_ENABLED"] = "false"
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai.types import Content, FunctionCall, Part
+from pydantic import PrivateAttr
+
+import main
+from agent import TravelPlannerAgent
+from traffic_capture import load_turns
+
+
+def build_model_calls(turn: dict[str, Any]) -> list[list[dict[str, Any]]]:
+    """Split a recorded turn into the model calls that produced it.
+
+    Each model call is the run of model events (text chunks and tool calls)
+    between tool results. Every step carries ``gap_ms``: the time since the
+    previous recorded event, i.e. the model latency to reproduce. Partial
+    chunks are recorded as lengths only, so their text is re-cut from the
+    call's final, redacted text.
+    """
+    calls: list[list[dict[str, Any]]] = []
+    current: list[dict[str, Any]] = []
+    previous_t = 0.0
+
+    for event in turn.get("events", []):
+        gap_ms = max(event["t"] - previous_t, 0.0)
+        previous_t = event["t"]
+
+        # Step 1: Tool results close the current model call; the next model
+        # event starts a fresh call with the tool output in its request.
+        if event.get("responses"):
+            if current:
+                calls.append(current)
+                current = []
+            continue
+
+        if event.get("author") == "user" or not (
+            event.get("text") or event.get("chars") or event.get("calls")
+        ):
+            continue
+
+        current.append(
+            {
+                "gap_ms": gap_ms,
+                "partial": bool(event.get("partial")),
+                "text": event.get("text", []),
+                "chars": event.get("chars", []),
+                "calls": event.get("calls", []),
+            }
+        )
+
+    if current:
+        calls.append(current)
+    for call in calls:
+        _fill_partial_text(call)
+    return calls
+
+
+def _fill_partial_text(steps: list[dict[str, Any]]) -> None:
+    # Step 1: Slice the final text of the call by the recorded chunk lengths.
+    # Redaction can change the final length, so the last chunk takes the rest.
+    final_text = "".join(
+        "".join(step["text"]) for step in steps if not step["partial"]
+    )
+    lengths = [length for step in steps if step["partial"] for length in step["chars"]]
+    chunks: list[str] = []
+    offset = 0
+    for index, length in enumerate(lengths):
+        end = len(final_text) if index == len(lengths) - 1 else offset + length
+        # Step 2: A turn cut off before its final event has no text to cut,
+        # so pad with filler that keeps the recorded chunk size.
+        chunks.append(final_text[offset:end] or "." * length)
+        offset = end
+
+    chunk_iter = iter(chunks)
+    for step in steps:
+        if step["partial"]:
+            step["text"] = [next(chunk_iter) for _ in step["chars"]]
+
+
+class ReplayLlm(BaseLlm):
+    """Model stub that streams back the recorded responses of a turn."""
+
+    speed: float = 1.0
+
+    _model_calls: deque = PrivateAttr(default_factory=deque)
+
+    def load_turn(self, turn: dict[str, Any]) -> None:
+        self._model_calls = deque(build_model_calls(turn))
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        # Step 1: If the live run asks for more model calls than were
+        # recorded, end the turn with an empty final response.
+        if not self._model_calls:
+            yield LlmResponse(content=Content(role="model", parts=[Part(text="")]))
+            return
+
+        for step in self._model_calls.popleft():
+            # Step 2: Reproduce the recorded inter-chunk timing.
+            if step["gap_ms"] and self.speed > 0:
+                await asyncio.sleep(step["gap_ms"] / 1000 / self.speed)
+
+            parts = [Part(text=text) for text in step["text"]]
+            parts += [
+                Part(function_call=FunctionCall(name=call["name"], args=call["args"]))
+                for call in step["calls"]
+            ]
+            yield LlmResponse(
+                content=Content(role="model", parts=parts),
+                partial=step["partial"],
+            )
+
+
+async def replay_turn(turn: dict[str, Any]) -> dict[str, Any]:
+    """POST one recorded prompt to ``/api/chat`` and time the SSE stream.
+
+    The ASGI app is called directly so ``send`` can timestamp each body
+    message as the app emits it; buffering test clients only hand back the
+    body once the whole turn has finished.
+    """
+    body = json.dumps(
+        {
+            "prompt": {"role": "user", "content": turn.get("prompt", "")},
+            "threadId": turn["thread_id"],
+        }
+    ).encode("utf-8")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/chat",
+        "raw_path": b"/api/chat",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"replay"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("replay", 80),
+    }
+    request_sent = False
+    status: Optional[int] = None
+    ttft_ms: Optional[float] = None
+    chunks = 0
+
+    async def receive() -> dict[str, Any]:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Step 1: The client never disconnects; the app cancels this wait
+        # once the response stream has finished.
+        await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal status, ttft_ms, chunks
+        # Step 2: Stamp the first non-empty body message as it leaves the app.
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            if ttft_ms is None:
+                ttft_ms = (time.perf_counter() - started) * 1000
+            chunks += 1
+
+    started = time.perf_counter()
+    await main.app(scope, receive, send)
+    if status != 200:
+        raise RuntimeError(f"/api/chat returned {status} for thread {turn['thread_id']}")
+
+    return {
+        "thread_id": turn["thread_id"],
+        "recorded_tier": (turn.get("route") or {}).get("tier"),
+        "recorded_ttft_ms": turn.get("ttft_ms"),
+        "recorded_duration_ms": turn.get("duration_ms"),
+        "replay_ttft_ms": round(ttft_ms, 2) if ttft_ms is not None else None,
+        "replay_duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        "replay_chunks": chunks,
+    }
+
+
+async def replay(
+    paths: list[str], speed: float = 1.0, limit: Optional[int] = None
+) -> list[dict[str, Any]]:
+    """Replay recorded turns in capture order and return per-turn timings."""
+    turns = load_turns(paths)[:limit]
+
+    # Step 1: Swap the app's agent for one backed by the replay stub. Sessions
+    # start empty, so multi-turn threads rebuild their history as they replay.
+    model = ReplayLlm(model="replay", speed=speed)
+    # The stub backs both tiers so routing decisions are still exercised.
+    main.travel_planner_agent = TravelPlannerAgent(model=model, fast_model=model)
+
+    # Step 2: Drive the real ASGI app in-process. Turns run sequentially so
+    # each one maps onto exactly one recorded model script.
+    results = []
+    for turn in turns:
+        model.load_turn(turn)
+        results.append(await replay_turn(turn))
+    return results
+
+
+def _summarize(results: list[dict[str, Any]], key: str) -> str:
+    values = [result[key] for result in results if result.get(key) is not None]
+    if not values:
+        return "n/a"
+    return f"mean={statistics.mean(values):.1f}ms p50={statistics.median(values):.1f}ms"
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="Capture files (rotated backups included).")
+    parser.add_argument("--speed", type=float, default=1.0, help="Timing multiplier; 0 disables delays.")
+    parser.add_argument("--limit", type=int, default=None, help="Replay only the first N turns.")
+    parser.add_argument("--output", default=None, help="Write per-turn results as JSON lines.")
+    args = parser.parse_args()
+
+    results = asyncio.run(replay(args.paths, speed=args.speed, limit=args.limit))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            for result in results:
+                handle.write(json.dumps(result) + "\n")
+
+    print(f"Replayed {len(results)} turns")
+    for label, key in (
+        ("recorded ttft", "recorded_ttft_ms"),
+        ("replay ttft", "replay_ttft_ms"),
+        ("recorded total", "recorded_duration_ms"),
+        ("replay total", "replay_duration_ms"),
+    ):
+        print(f"  {label:<15} {_summarize(results, key)}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,160 @@
+"""
+Offline benchmark for tiered model routing using stub models.
+
+Drives ``TravelPlannerAgent.process_message`` over a mixed conversation once
+with every turn on the full tier and once with routing enabled, then prints
+the mean time-to-first-token of each run and the per-tier routing stats.
+
+Usage:
+    python routing_bench.py [--fast-ttft-ms 150] [--full-ttft-ms 900]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import AsyncGenerator, Optional
+
+# Step 1: The benchmark never reaches the real model and must not record
+# itself, so neutralize credentials and capture before importing the agent.
+os.environ.setdefault("THESYS_API_KEY", "bench-offline")
+os.environ["TRAFFIC_CAPTURE_ENABLED"] = "false"
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai.types import Content, Part
+
+from agent import TravelPlannerAgent
+
+
+def _trigger(action: str, payload: dict) -> str:
+    # Mirrors the message built by frontend/app/triggers.ts.
+    serialized = json.dumps(
+        {"source": "travel_custom_component", "action": action, "payload": payload}
+    )
+    return "\n".join(
+        [
+            f"COMPONENT_TRIGGER {serialized}",
+            "Treat this as an explicit user action from the UI.",
+            "Use tools as needed and respond with updated travel recommendations using custom components.",
+        ]
+    )
+
+
+# Mixed traffic shaped like real threads: planning requests, answers to
+# clarification questions, selections and change requests (full tier)
+# alongside comparison and acknowledgement turns (fast tier).
+VAGUE_REQUEST = "Somewhere warm"
+MIXED_TRAFFIC = {
+    "bench-thread-1": [
+        "Plan a 5 day trip from New York to Lisbon in June for two people",
+        _trigger("compare_flights", {}),
+        _trigger("select_flight", {"flight_id": "FL-1"}),
+        _trigger("compare_hotels", {}),
+        _trigger("select_hotel", {"hotel_id": "HT-2"}),
+        "Thanks, looks great!",
+        _trigger("optimize_budget", {}),
+    ],
+    "bench-thread-2": [
+        VAGUE_REQUEST,
+        "From Chicago, mid March",
+        _trigger("compare_flights", {}),
+        _trigger("select_flight", {"flight_id": "FL-3"}),
+        _trigger("compare_hotels", {}),
+        "What about Porto?",
+        "Great, thanks",
+    ],
+}
+
+# The stub asks a clarification question for the vague request and renders
+# a custom component for everything else, as the system prompt requires.
+CLARIFICATION_REPLY = "Which city are you leaving from, and when would you like to go?"
+COMPONENT_REPLY = "Here are your updated options. FlightList HotelCardGrid"
+
+
+class StubLlm(BaseLlm):
+    """Model stub with a fixed time to first token and inter-chunk delay."""
+
+    ttft_ms: float
+    chunk_ms: float = 20.0
+    chunks: int = 5
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        # Step 1: Pick the reply shape from the latest user message.
+        last_user_text = next(
+            (
+                part.text
+                for content in reversed(llm_request.contents)
+                if content.role == "user" and content.parts
+                for part in content.parts
+                if part.text
+            ),
+            "",
+        )
+        reply = CLARIFICATION_REPLY if last_user_text == VAGUE_REQUEST else COMPONENT_REPLY
+
+        # Step 2: Stream it in a few partial chunks, then the aggregated text.
+        await asyncio.sleep(self.ttft_ms / 1000)
+        size = -(-len(reply) // self.chunks)
+        texts = []
+        for index in range(self.chunks):
+            if index:
+                await asyncio.sleep(self.chunk_ms / 1000)
+            text = reply[index * size : (index + 1) * size]
+            texts.append(text)
+            yield LlmResponse(
+                content=Content(role="model", parts=[Part(text=text)]),
+                partial=True,
+            )
+        yield LlmResponse(content=Content(role="model", parts=[Part(text="".join(texts))]))
+
+
+async def run_traffic(agent: TravelPlannerAgent) -> list[float]:
+    """Send ``MIXED_TRAFFIC`` through ``agent`` and return per-turn TTFT in ms."""
+    ttfts = []
+    for thread_id, messages in MIXED_TRAFFIC.items():
+        for message in messages:
+            started = time.perf_counter()
+            ttft_ms: Optional[float] = None
+            async for _chunk in agent.process_message(thread_id, message):
+                if ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - started) * 1000
+            if ttft_ms is not None:
+                ttfts.append(ttft_ms)
+    return ttfts
+
+
+async def bench(fast_ttft_ms: float, full_ttft_ms: float) -> None:
+    full_model = StubLlm(model="full", ttft_ms=full_ttft_ms)
+    fast_model = StubLlm(model="fast", ttft_ms=fast_ttft_ms)
+
+    # Step 1: Baseline with every turn pinned to the full tier.
+    baseline = await run_traffic(TravelPlannerAgent(model=full_model))
+
+    # Step 2: Same traffic with the classifier routing cheap turns to fast.
+    routed_agent = TravelPlannerAgent(model=full_model, fast_model=fast_model)
+    routed = await run_traffic(routed_agent)
+
+    print(f"Turns: {len(baseline)}")
+    print(f"  full tier only  mean ttft={statistics.mean(baseline):.1f}ms")
+    print(f"  tiered routing  mean ttft={statistics.mean(routed):.1f}ms")
+    print(json.dumps(routed_agent.routing_stats.snapshot(), indent=2))
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fast-ttft-ms", type=float, default=150.0)
+    parser.add_argument("--full-ttft-ms", type=float, default=900.0)
+    args = parser.parse_args()
+    asyncio.run(bench(args.fast_ttft_ms, args.full_ttft_ms))
+
+
+if __name__ == "__main__":
+    main_cli()
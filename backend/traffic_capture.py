@@ -0,0 +1,275 @@
+"""Optional per-turn traffic capture for offline performance replay.
+
+Each call to ``TravelPlannerAgent.process_message`` can be recorded as one
+compact JSON line holding the prompt, every event streamed by
+``runner.run_async`` (chunk lengths, final text, tool calls and tool
+results) and the millisecond offset at which it arrived. ``replay.py`` reads these logs back.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import re
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Optional
+
+from config import (
+    TRAFFIC_CAPTURE_BACKUP_COUNT,
+    TRAFFIC_CAPTURE_ENABLED,
+    TRAFFIC_CAPTURE_MAX_BYTES,
+    TRAFFIC_CAPTURE_PATH,
+    TRAFFIC_CAPTURE_REDACT_KEYS,
+)
+
+if TYPE_CHECKING:
+    from model_router import RouteDecision
+
+CAPTURE_FORMAT_VERSION = 2
+REDACTED = "[REDACTED]"
+
+_EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+# Card numbers as written: an unbroken 13-19 digit run, 4-4-4-4 groups, or
+# the 4-6-5 / 4-6-4 groups used by Amex and Diners. Anchoring to groupings
+# keeps a trailing CVV or expiry date out of the match.
+_CARD_NUMBER_PATTERN = re.compile(
+    r"(?<!\d)(?:\d{13,19}"
+    r"|\d{4}([ -])\d{4}\1\d{4}\1\d{4}"
+    r"|\d{4}([ -])\d{6}\2\d{4,5})(?!\d)"
+)
+_KEY_SEGMENT_PATTERN = re.compile(r"[^a-z0-9]+")
+_CAMEL_BOUNDARY_PATTERN = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+
+def _passes_luhn(digits: str) -> bool:
+    # Step 1: Double every second digit from the right and check the sum,
+    # so booking references and timestamps are not mistaken for cards.
+    total = 0
+    for index, char in enumerate(reversed(digits)):
+        digit = int(char)
+        if index % 2:
+            digit = digit * 2 - 9 if digit > 4 else digit * 2
+        total += digit
+    return total % 10 == 0
+
+
+def _redact_card_number(match: re.Match) -> str:
+    digits = re.sub(r"\D", "", match.group())
+    return REDACTED if _passes_luhn(digits) else match.group()
+
+
+def _redact_text(text: str) -> str:
+    # Step 1: Scrub free-form identifiers that can appear in prompts or
+    # in model output echoing the prompt.
+    text = _EMAIL_PATTERN.sub(REDACTED, text)
+    return _CARD_NUMBER_PATTERN.sub(_redact_card_number, text)
+
+
+def _key_segments(key: str) -> tuple[str, ...]:
+    """Split ``apiKey``, ``api_key`` or ``API-Key`` into ``("api", "key")``."""
+    key = _CAMEL_BOUNDARY_PATTERN.sub("_", key).lower()
+    return tuple(segment for segment in _KEY_SEGMENT_PATTERN.split(key) if segment)
+
+
+def _is_sensitive_key(key: str, markers: Iterable[tuple[str, ...]]) -> bool:
+    # Step 1: A key is sensitive when a marker's segments appear in it as a
+    # contiguous run, so ``access_token`` matches ``token`` but
+    # ``max_tokens`` does not.
+    segments = _key_segments(key)
+    return any(
+        segments[start : start + len(marker)] == marker
+        for marker in markers
+        if marker
+        for start in range(len(segments) - len(marker) + 1)
+    )
+
+
+def redact(value: Any, redact_keys: Iterable[str]) -> Any:
+    """Return a JSON-safe copy of ``value`` with sensitive fields masked.
+
+    A mapping key whose ``_``/``-``/camelCase segments contain one of
+    ``redact_keys`` (case-insensitive) has its value replaced, and strings
+    are scrubbed of emails and Luhn-valid card numbers.
+    """
+    keys = tuple(redact_keys)
+    markers = [_key_segments(key) for key in keys]
+    if isinstance(value, dict):
+        return {
+            str(key): REDACTED
+            if _is_sensitive_key(str(key), markers)
+            else redact(item, keys)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(item, keys) for item in value]
+    if isinstance(value, str):
+        return _redact_text(value)
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return _redact_text(str(value))
+
+
+class TurnRecording:
+    """Accumulates the events of a single turn until it is finished."""
+
+    def __init__(
+        self, recorder: "TrafficRecorder", thread_id: str, user_message: str
+    ) -> None:
+        self._recorder = recorder
+        self._started = time.perf_counter()
+        self._first_text_ms: Optional[float] = None
+        self._finished = False
+        self.error: Optional[str] = None
+        self.record: dict[str, Any] = {
+            "v": CAPTURE_FORMAT_VERSION,
+            "thread_id": thread_id,
+            "started_at": time.time(),
+            "prompt": recorder.redact(user_message),
+            "events": [],
+        }
+
+    def _elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self._started) * 1000, 2)
+
+    def set_route(self, decision: "RouteDecision") -> None:
+        """Store the model tier the turn was routed to and why."""
+        self.record["route"] = {"tier": decision.tier, "reason": decision.reason}
+
+    def add_event(self, event: Any) -> None:
+        """Append a compact, redacted summary of an ADK ``Event``."""
+        # Step 1: Timestamp relative to turn start so replays are portable.
+        entry: dict[str, Any] = {
+            "t": self._elapsed_ms(),
+            "author": event.author,
+        }
+        if event.partial:
+            entry["partial"] = True
+
+        # Step 2: Keep only what replay needs: text, tool calls with
+        # arguments, and the names of tool results that came back. Partial
+        # chunks split text at arbitrary points, which would let an email or
+        # card number slip past redaction, so only their lengths are kept;
+        # the text itself comes from the final, aggregated event.
+        texts = [
+            part.text
+            for part in (event.content.parts if event.content and event.content.parts else [])
+            if part.text
+        ]
+        if texts:
+            if event.partial:
+                entry["chars"] = [len(text) for text in texts]
+            else:
+                entry["text"] = [self._recorder.redact(text) for text in texts]
+            if self._first_text_ms is None:
+                self._first_text_ms = entry["t"]
+
+        calls = event.get_function_calls()
+        if calls:
+            entry["calls"] = [
+                {
+                    "id": call.id,
+                    "name": call.name,
+                    "args": self._recorder.redact(call.args or {}),
+                }
+                for call in calls
+            ]
+
+        responses = event.get_function_responses()
+        if responses:
+            entry["responses"] = [
+                {"id": response.id, "name": response.name} for response in responses
+            ]
+
+        self.record["events"].append(entry)
+
+    def finish(self) -> None:
+        """Stamp turn-level timings and hand the record to the writer."""
+        if self._finished:
+            return
+        self._finished = True
+        self.record["duration_ms"] = self._elapsed_ms()
+        self.record["ttft_ms"] = self._first_text_ms
+        if self.error:
+            self.record["error"] = self.error
+        self._recorder.write(self.record)
+
+
+class TrafficRecorder:
+    """Appends turn recordings to a size-rotated JSON-lines log.
+
+    Records are pushed through a queue and written on a background thread,
+    so the streaming request path never blocks on file I/O.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_bytes: int = TRAFFIC_CAPTURE_MAX_BYTES,
+        backup_count: int = TRAFFIC_CAPTURE_BACKUP_COUNT,
+        redact_keys: Iterable[str] = TRAFFIC_CAPTURE_REDACT_KEYS,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.redact_keys = tuple(key.lower() for key in redact_keys)
+
+        # Step 1: The rotating handler owns the file; the listener thread
+        # drains the queue into it.
+        file_handler = RotatingFileHandler(
+            self.path,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding="utf-8",
+        )
+        file_handler.setFormatter(logging.Formatter("%(message)s"))
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._file_handler = file_handler
+        self._listener = QueueListener(self._queue, file_handler)
+        self._listener.start()
+        self._closed = False
+
+        # Step 2: Use a dedicated, non-propagating logger so turn records
+        # never leak into the application's regular logs.
+        self._logger = logging.getLogger(f"{__name__}.{id(self)}")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        self._logger.addHandler(QueueHandler(self._queue))
+
+    def redact(self, value: Any) -> Any:
+        return redact(value, self.redact_keys)
+
+    def start_turn(self, thread_id: str, user_message: str) -> TurnRecording:
+        return TurnRecording(self, thread_id, user_message)
+
+    def write(self, record: dict[str, Any]) -> None:
+        self._logger.info(json.dumps(record, separators=(",", ":"), default=str))
+
+    def close(self) -> None:
+        """Flush pending records and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._listener.stop()
+        self._file_handler.close()
+
+
+def recorder_from_config() -> Optional[TrafficRecorder]:
+    """Build the recorder described by ``config``; ``None`` when disabled."""
+    if not TRAFFIC_CAPTURE_ENABLED:
+        return None
+    return TrafficRecorder(TRAFFIC_CAPTURE_PATH)
+
+
+def load_turns(paths: Iterable[str | Path]) -> list[dict[str, Any]]:
+    """Read recorded turns from one or more capture files, oldest first."""
+    turns: list[dict[str, Any]] = []
+    for path in paths:
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if line:
+                    turns.append(json.loads(line))
+    turns.sort(key=lambda turn: turn.get("started_at", 0))
+    return turns
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Backend modules use flat imports (``from config import ...``), as when
+# the server is started from the backend directory.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
@@ -0,0 +1,56 @@
+"""Tests for turn classification in tiered model routing."""
+
+import json
+
+from model_router import FAST_TIER, FULL_TIER, ThreadEvent, TurnClassifier
+
+CLARIFICATION_THREAD = [
+    ThreadEvent("user", "Somewhere warm"),
+    ThreadEvent("model", "Which city are you leaving from, and when?"),
+]
+RENDERED_THREAD = [
+    ThreadEvent("user", "Plan a trip from New York to Lisbon in June"),
+    ThreadEvent("model", has_function_calls=True),
+    ThreadEvent("model", "Here are your flights. FlightList"),
+]
+
+
+def _trigger(action):
+    payload = {"source": "travel_custom_component", "action": action, "payload": {}}
+    return f"COMPONENT_TRIGGER {json.dumps(payload)}\nTreat this as an explicit user action."
+
+
+def _classify(message, history=()):
+    return TurnClassifier().classify(message, history)
+
+
+def test_first_message_of_thread_is_full():
+    decision = _classify("Tokyo")
+    assert (decision.tier, decision.reason) == (FULL_TIER, "thread_start")
+
+
+def test_clarification_answer_is_full():
+    decision = _classify("Lisbon, 2 adults, $3000", CLARIFICATION_THREAD)
+    assert (decision.tier, decision.reason) == (FULL_TIER, "clarification_answer")
+
+
+def test_short_change_requests_are_full():
+    for message in ("What about Porto?", "Go with the second one", "Can you make it cheaper?"):
+        assert _classify(message, RENDERED_THREAD).tier == FULL_TIER, message
+
+
+def test_acknowledgements_are_fast():
+    for message in ("Thanks!", "Thanks, looks great!", "ok", "Great, thanks so much"):
+        decision = _classify(message, RENDERED_THREAD)
+        assert (decision.tier, decision.reason) == (FAST_TIER, "acknowledgement"), message
+
+
+def test_compare_triggers_are_fast():
+    for action in ("compare_flights", "compare_hotels"):
+        assert _classify(_trigger(action), RENDERED_THREAD).tier == FAST_TIER
+
+
+def test_selection_and_planning_triggers_are_full():
+    for action in ("select_flight", "select_hotel", "optimize_budget", "regenerate_itinerary"):
+        decision = _classify(_trigger(action), RENDERED_THREAD)
+        assert (decision.tier, decision.reason) == (FULL_TIER, f"trigger:{action}")
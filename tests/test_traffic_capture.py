@@ -0,0 +1,44 @@
+"""Tests for redaction in traffic capture."""
+
+from traffic_capture import REDACTED, redact
+
+REDACT_KEYS = ["api_key", "authorization", "password", "secret", "token", "email", "phone"]
+
+
+def test_redacts_card_number_followed_by_cvv():
+    assert redact("4111111111111111 123", REDACT_KEYS) == f"{REDACTED} 123"
+
+
+def test_redacts_grouped_card_number_followed_by_expiry():
+    assert redact("4111 1111 1111 1111 12/26", REDACT_KEYS) == f"{REDACTED} 12/26"
+
+
+def test_redacts_amex_grouping():
+    assert redact("card 3782 822463 10005", REDACT_KEYS) == f"card {REDACTED}"
+
+
+def test_keeps_digit_runs_that_fail_luhn():
+    text = "booking 20261019123045123 at 1700000000000"
+    assert redact(text, REDACT_KEYS) == text
+
+
+def test_redacts_email():
+    assert redact("mail me at jo@example.com", REDACT_KEYS) == f"mail me at {REDACTED}"
+
+
+def test_key_segments_do_not_match_partial_words():
+    redacted = redact({"max_tokens": 512, "access_token": "abc"}, REDACT_KEYS)
+    assert redacted == {"max_tokens": 512, "access_token": REDACTED}
+
+
+def test_camel_case_and_dashed_keys_match_multi_segment_markers():
+    redacted = redact(
+        {"apiKey": "k", "API-Key": "k", "userEmail": "e", "nested": [{"Authorization": "b"}]},
+        REDACT_KEYS,
+    )
+    assert redacted == {
+        "apiKey": REDACTED,
+        "API-Key": REDACTED,
+        "userEmail": REDACTED,
+        "nested": [{"Authorization": REDACTED}],
+    }